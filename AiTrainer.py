@@ -1,13 +1,39 @@
 import cv2
 import numpy as np
+import os
+import queue
+import threading
 import time
 import PoseModule as pm
+from exercise_core import INTER_STAGE_WARNINGS, STAGE_NAMES, ExerciseCore
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+# Speed messages the feedback box highlights as warnings.
+_FEEDBACK_WARN = INTER_STAGE_WARNINGS | frozenset(("REP RESET", "BAD TIMING"))
+
+# Relations a 'positional' form check can test between its two landmarks
+# (a, b), all in pixel coordinates. The check fails when the relation holds.
+#   x_y_ratio_below:  |a.x - b.x| / |a.y - b.y| < threshold
+#   above:            a.y < b.y - threshold (a is higher up in the frame)
+#   y_distance_above: |a.y - b.y| > threshold
+POS_X_Y_RATIO_BELOW, POS_ABOVE, POS_Y_DISTANCE_ABOVE = 0, 1, 2
+POSITIONAL_RELATIONS = {
+    "x_y_ratio_below": POS_X_Y_RATIO_BELOW,
+    "above": POS_ABOVE,
+    "y_distance_above": POS_Y_DISTANCE_ABOVE,
+}
 
 
 class Exercise:
     """
     Handles the logic for a specific exercise, tracking state, counting
-    repetitions, validating form, and checking timing.
+    repetitions, validating form, and checking timing. The rep state machine
+    itself is delegated to exercise_core.ExerciseCore.
     """
 
     def __init__(
@@ -33,183 +59,151 @@ class Exercise:
         self.time_tolerance = timing.get("tolerance", 0.5)
         self.total_rep_time = self.concentric_time + self.hold_time + self.eccentric_time
 
-        self.good_reps = 0
-        self.bad_reps = 0
-        self.stage = "down"
-        self.stage_start_time = time.time()
-        self.feedback_set_time = time.time()
+        # Affine map from angle to percentage, precomputed so the per-frame
+        # conversion is plain float math.
+        lo, hi = angle_range
+        scale = 100 / (hi - lo)
+        if progress_type == "inverse":
+            self._per_slope, self._per_offset = scale, -lo * scale
+        else:
+            self._per_slope, self._per_offset = -scale, 100 + lo * scale
+
+        # One or two (averaged) landmark triplets define the tracked angle.
+        self._primary_idx = np.array(landmarks, dtype=np.int32).reshape(-1, 3)
+        self._joint_idx = np.unique(self._primary_idx)
+
+        # The tracked angle and every angle form check are computed together
+        # in one calculate_angles call; the rows after the primary ones are
+        # the angle checks in config order, i.e. indexed by their "_slot".
+        # An angle check fails when sign * (angle - threshold) > 0.
+        angle_checks = [c for c in self.form_checks if c["check_type"] == "angle"]
+        self._angle_idx = np.concatenate(
+            [self._primary_idx, np.array([c["landmarks"] for c in angle_checks], dtype=np.int32).reshape(-1, 3)]
+        )
+        self._n_primary = len(self._primary_idx)
+        self._angle_thresholds = np.array([c["threshold"] for c in angle_checks], dtype=np.float64)
+        self._angle_signs = np.array([c["_cmp_sign"] for c in angle_checks], dtype=np.float64)
+
+        self.core = ExerciseCore(
+            self.concentric_time,
+            self.hold_time,
+            self.eccentric_time,
+            self.time_tolerance,
+            time.monotonic(),
+        )
         self.form_feedback = "START"
-        self.speed_feedback = "START"
-        self.rep_timing_is_good = True
 
-    def _calculate_angle(self, detector, lmList, p1, p2, p3, img):
-        """Internal helper to find and draw an angle."""
-        return detector.findAngle(lmList[p1], lmList[p2], lmList[p3], img=img, draw=True)
+        # Pre-rendered rep counter box, redrawn only when the counts change
+        self.rep_cache_counts = None
+        self.rep_cache_buf = None
+        self.rep_cache_fits = True
+
+    @property
+    def good_reps(self):
+        return self.core.good_reps
+
+    @property
+    def bad_reps(self):
+        return self.core.bad_reps
+
+    @property
+    def speed_feedback(self):
+        return self.core.speed_feedback
+
+    @property
+    def stage(self):
+        return STAGE_NAMES[self.core.stage]
 
     # <<< NEW METHOD TO HANDLE PERCENTAGE LOGIC >>>
-    def _calculate_percentage(self, angle, angle_range, progress_type):
+    def _calculate_percentage(self, angle):
         """
         Calculates the exercise percentage, inverting the logic for 'lift' types.
+        For lifts a larger angle means a higher percentage (e.g., glute bridge),
+        for curls/presses a smaller angle does (e.g., bicep curl).
         """
-        # For lifts, a larger angle means higher percentage (e.g., glute bridge)
-        if progress_type == "inverse":
-            # Maps from [min_angle, max_angle] to [0, 100]
-            return np.interp(angle, (angle_range[0], angle_range[1]), (0, 100))
-        # For curls/presses, a smaller angle means higher percentage (e.g., bicep curl)
-        else:
-            # Maps from [min_angle, max_angle] to [100, 0]
-            return np.interp(angle, (angle_range[0], angle_range[1]), (100, 0))
+        per = angle * self._per_slope + self._per_offset
+        return 0.0 if per < 0 else 100.0 if per > 100 else per
 
-    def update(self, img, detector, lmList):
+    def draw_skeleton(self, img, lmList):
         """
-        Processes a new frame to update exercise state, returning UI values.
+        Draws the tracked angle(s) onto the frame: all limb segments in one
+        polylines call, each joint once, and the angle value at each vertex.
+        Kept separate from update so the overlay can be redrawn on frames
+        that reuse earlier landmarks.
         """
-        pace_progress = 0.0
-        inter_stage_warnings = ["TOO FAST", "TOO SLOW", "HOLD AT TOP"]
-
-        if isinstance(self.landmarks[0], list):
-            angle1 = self._calculate_angle(detector, lmList, *self.landmarks[0], img)
-            angle2 = self._calculate_angle(detector, lmList, *self.landmarks[1], img)
-            angle = (angle1 + angle2) / 2
-        else:
-            angle = self._calculate_angle(detector, lmList, *self.landmarks, img)
+        xy = lmList[:, 1:3]
+        pts = xy[self._primary_idx].astype(np.int32)
+        cv2.polylines(img, pts, False, (255, 255, 255), 3)
+        for x, y in xy[self._joint_idx].astype(np.int32).tolist():
+            cv2.circle(img, (x, y), 10, (0, 0, 255), cv2.FILLED)
+            cv2.circle(img, (x, y), 15, (0, 0, 255), 2)
+        for angle, (x, y) in zip(calculate_angles(xy[self._primary_idx]).tolist(), pts[:, 1].tolist()):
+            cv2.putText(img, str(int(angle)), (x - 50, y + 50), cv2.FONT_HERSHEY_PLAIN, 2, (0, 0, 255), 2)
+
+    def _positional_fails(self, lmList, check):
+        """Evaluates one positional check from scalar reads of its two landmark rows."""
+        lm1_id, lm2_id = check["landmarks"]
+        # Ensure landmarks are available before checking
+        if lm1_id >= len(lmList) or lm2_id >= len(lmList):
+            return False
+        dx = abs(lmList.item(lm1_id, 1) - lmList.item(lm2_id, 1))
+        dy = lmList.item(lm1_id, 2) - lmList.item(lm2_id, 2)
+        threshold, kind = check["threshold"], check["_kind"]
+        if kind == POS_X_Y_RATIO_BELOW:
+            return dx < threshold * abs(dy)
+        if kind == POS_ABOVE:
+            return dy < -threshold
+        return abs(dy) > threshold
+
+    def update(self, lmList, now):
+        """
+        Processes fresh landmarks to update exercise state, returning UI values.
+        `now` is the frame's time.monotonic() timestamp.
+        """
+        angles = calculate_angles(lmList[:, 1:3][self._angle_idx])
+        n = self._n_primary
+        angle = angles.item(0) if n == 1 else float(angles[:n].mean())
+        angle_fails = (self._angle_signs * (angles[n:] - self._angle_thresholds) > 0).tolist()
 
         # <<< MODIFIED: Use the new helper function for all percentage and bar calculations >>>
-        per = self._calculate_percentage(angle, self.angle_range, self.type)
+        per = self._calculate_percentage(angle)
         # The bar calculation should always go from 100% to 0% of its height
-        bar = np.interp(per, (0, 100), (650, 100))
+        bar = 650 - per * 5.5
 
         # <<< MODIFIED: Upgraded form checking logic >>>
         current_form_is_good = True
         self.form_feedback = "GOOD"
         for check in self.form_checks:
-            # Default to 'angle' check if type is not specified
-            check_type = check.get("check_type", "angle")
+            check_type = check["check_type"]
 
             if check_type == "visibility":
-                if not check_body_visibility(detector.lmList, check["landmarks"]):
+                if not check_body_visibility(lmList, check["landmarks"]):
                     self.form_feedback = check["feedback"]
                     current_form_is_good = False
                     break
 
             # <<< NEW: Logic to handle 'positional' checks >>>
             elif check_type == "positional":
-                lm1_id, lm2_id = check["landmarks"]
-                # Ensure landmarks are available before checking
-                if lm1_id < len(lmList) and lm2_id < len(lmList):
-                    if check["condition"](lmList[lm1_id], lmList[lm2_id]):
-                        self.form_feedback = check["feedback"]
-                        current_form_is_good = False
-                        break
+                if self._positional_fails(lmList, check):
+                    self.form_feedback = check["feedback"]
+                    current_form_is_good = False
+                    break
 
             elif check_type == "angle":
-                check_angle = detector.findAngle(
-                    lmList[check["landmarks"][0]],
-                    lmList[check["landmarks"][1]],
-                    lmList[check["landmarks"][2]],
-                    img=img,
-                    draw=False,
-                )
-                if check["condition"](check_angle, check["threshold"]):
+                if angle_fails[check["_slot"]]:
                     self.form_feedback = check["feedback"]
                     current_form_is_good = False
                     break
         # <<< END of MODIFIED block >>>
 
-        current_time = time.time()
-        elapsed_stage_time = current_time - self.stage_start_time
-
-        is_moving = self.stage in ["going_up", "hold", "going_down"]
-        if (not current_form_is_good and is_moving) or (per <= 5 and self.stage in ["going_up", "hold"]):
-            self.stage = "down"
-            self.speed_feedback = "REP RESET"
-            self.feedback_set_time = current_time
-
-        if self.stage == "down":
-            final_rep_messages = [
-                "GOOD REP!",
-                "BAD TIMING",
-                "REP RESET",
-            ] + inter_stage_warnings
-            if self.speed_feedback in final_rep_messages and (current_time - self.feedback_set_time < 1.0):
-                pass
-            else:
-                self.speed_feedback = "LIFT UP"
-
-            if per >= 10:
-                self.stage = "going_up"
-                self.stage_start_time = current_time
-                self.rep_timing_is_good = True
-
-        elif self.stage == "going_up":
-            is_warning_active = self.speed_feedback in inter_stage_warnings
-            if is_warning_active and (current_time - self.feedback_set_time < 0.5):
-                pass
-            else:
-                self.speed_feedback = "GO"
-            progress_time = min(elapsed_stage_time, self.concentric_time)
-            pace_progress = progress_time / self.total_rep_time
-            if per >= 90:
-                if abs(elapsed_stage_time - self.concentric_time) > self.time_tolerance:
-                    self.speed_feedback = "TOO FAST" if elapsed_stage_time < self.concentric_time else "TOO SLOW"
-                    self.feedback_set_time = current_time
-                    self.rep_timing_is_good = False
-                self.stage = "hold"
-                self.stage_start_time = current_time
-            elif elapsed_stage_time > self.concentric_time + self.time_tolerance:
-                self.speed_feedback = "TOO SLOW"
-                self.rep_timing_is_good = False
-
-        elif self.stage == "hold":
-            is_warning_active = self.speed_feedback in inter_stage_warnings
-            if is_warning_active and (current_time - self.feedback_set_time < 0.5):
-                pass
-            else:
-                self.speed_feedback = "HOLD"
-            concentric_progress = self.concentric_time / self.total_rep_time
-            hold_progress = elapsed_stage_time / self.total_rep_time
-            pace_progress = concentric_progress + hold_progress
-            if per < 90:
-                self.speed_feedback = "HOLD AT TOP"
-                self.rep_timing_is_good = False
-                self.feedback_set_time = current_time
-                self.stage = "going_down"
-                self.stage_start_time = current_time
-            elif elapsed_stage_time >= self.hold_time:
-                self.stage = "going_down"
-                self.stage_start_time = current_time
-
-        elif self.stage == "going_down":
-            is_warning_active = self.speed_feedback in inter_stage_warnings
-            if is_warning_active and (current_time - self.feedback_set_time < 0.5):
-                pass
-            else:
-                self.speed_feedback = "BACK SLOWLY"
-            concentric_hold_progress = (self.concentric_time + self.hold_time) / self.total_rep_time
-            eccentric_progress = elapsed_stage_time / self.total_rep_time
-            pace_progress = concentric_hold_progress + eccentric_progress
-            if per <= 5:
-                if abs(elapsed_stage_time - self.eccentric_time) > self.time_tolerance:
-                    self.speed_feedback = "TOO FAST" if elapsed_stage_time < self.eccentric_time else "TOO SLOW"
-                    self.rep_timing_is_good = False
-                if self.rep_timing_is_good and current_form_is_good:
-                    self.good_reps += 1
-                    self.speed_feedback = "GOOD REP!"
-                else:
-                    self.bad_reps += 1
-                    if self.speed_feedback not in inter_stage_warnings:
-                        self.speed_feedback = "BAD TIMING"
-                self.feedback_set_time = current_time
-                self.stage = "down"
-
-        pace_progress = min(pace_progress, 1.0)
+        good_reps, bad_reps, speed_feedback, pace_progress = self.core.update(per, current_form_is_good, now)
         return (
             bar,
             per,
-            self.good_reps,
-            self.bad_reps,
+            good_reps,
+            bad_reps,
             self.form_feedback,
-            self.speed_feedback,
+            speed_feedback,
             pace_progress,
         )
 
@@ -290,19 +284,22 @@ EXERCISE_CONFIG = {
             {
                 "check_type": "positional",
                 "landmarks": [12, 24],  # R_Shoulder, R_Hip
-                "condition": lambda shoulder, hip: (abs(shoulder[1] - hip[1]) / abs(shoulder[2] - hip[2])) < 0.15,
+                "relation": "x_y_ratio_below",  # Torso too upright
+                "threshold": 0.15,
                 "feedback": "LEAN FORWARD MORE",
             },
             {
                 "check_type": "positional",
                 "landmarks": [14, 12],  # R_Elbow, R_Shoulder
-                "condition": lambda elbow, shoulder: elbow[2] < shoulder[2] - 30,  # -30 for pixel tolerance
+                "relation": "above",
+                "threshold": 30,  # 30 for pixel tolerance
                 "feedback": "TUCK YOUR ELBOWS",
             },
             {
                 "check_type": "positional",
                 "landmarks": [16, 12],  # R_Wrist, R_Shoulder
-                "condition": lambda wrist, shoulder: wrist[2] < shoulder[2],
+                "relation": "above",
+                "threshold": 0,
                 "feedback": "LOWER YOUR HANDS",
             },
             {
@@ -340,7 +337,8 @@ EXERCISE_CONFIG = {
             {
                 "check_type": "positional",
                 "landmarks": [12, 28],  # R_Shoulder, R_Ankle
-                "condition": lambda shoulder, ankle: abs(shoulder[2] - ankle[2]) > 40,
+                "relation": "y_distance_above",
+                "threshold": 40,
                 "feedback": "KEEP SHOULDERS & FEET ON GROUND",
             },
         ],
@@ -365,7 +363,8 @@ EXERCISE_CONFIG = {
             {
                 "check_type": "positional",
                 "landmarks": [26, 24],  # R_Knee, R_Hip
-                "condition": lambda knee, hip: knee[2] < hip[2],  # Checks if knee's y-coord is above hip's y-coord
+                "relation": "above",  # Checks if knee's y-coord is above hip's y-coord
+                "threshold": 0,
                 "feedback": "KEEP THIGH ON CHAIR",
             },
         ],
@@ -376,6 +375,31 @@ EXERCISE_CONFIG = {
     },
 }
 
+
+def prepare_exercise_config(config):
+    """
+    Compiles the form checks into plain numeric data once at load time.
+    Angle conditions (a > t or a < t) are probed once and replaced by a
+    comparator sign plus the check's slot among the exercise's angle checks,
+    and positional relations are mapped to their kind codes.
+    """
+    for exercise in config.values():
+        n_angle_checks = 0
+        for check in exercise.get("form_checks", []):
+            # Default to 'angle' check if type is not specified
+            check_type = check.setdefault("check_type", "angle")
+            if check_type == "angle":
+                threshold = check["threshold"]
+                check["_cmp_sign"] = 1.0 if check.pop("condition")(threshold + 1, threshold) else -1.0
+                check["_slot"] = n_angle_checks
+                n_angle_checks += 1
+            elif check_type == "positional":
+                check["_kind"] = POSITIONAL_RELATIONS[check["relation"]]
+    return config
+
+
+prepare_exercise_config(EXERCISE_CONFIG)
+
 UI_CONFIG = {
     "colors": {
         "bg": (0, 0, 0),
@@ -397,15 +421,25 @@ UI_CONFIG = {
 # ===============================================================
 
 
+@njit(cache=True)
+def calculate_angles(pts):
+    """
+    Vectorized poseDetector.findAngle over a (K, 3, 2) array of (x, y)
+    landmark triplets, returning K angles in degrees within [0, 180].
+    """
+    v1 = pts[:, 0] - pts[:, 1]
+    v2 = pts[:, 2] - pts[:, 1]
+    angles = np.degrees(np.arctan2(v2[:, 1], v2[:, 0]) - np.arctan2(v1[:, 1], v1[:, 0])) % 360
+    return np.where(angles > 180, 360 - angles, angles)
+
+
 def check_body_visibility(full_lmList, required_ids, threshold=0.7):
-    if not full_lmList:
+    if full_lmList is None or len(full_lmList) == 0:
         return False
+    # A few scalar reads beat fancy indexing for the handful of ids checked
+    n = len(full_lmList)
     for landmark_id in required_ids:
-        if (
-            landmark_id >= len(full_lmList)
-            or len(full_lmList[landmark_id]) < 4
-            or full_lmList[landmark_id][3] < threshold
-        ):
+        if landmark_id >= n or full_lmList.item(landmark_id, 3) < threshold:
             return False
     return True
 
@@ -422,10 +456,9 @@ def draw_feedback_box(img, form_feedback, speed_feedback):
     colors = UI_CONFIG["colors"]
     cv2.rectangle(img, (x, y), (x + w, y + h), colors["bg"], cv2.FILLED)
     form_color = colors["good"] if form_feedback == "GOOD" else colors["bad"]
-    warning_msgs = ["TOO FAST", "TOO SLOW", "REP RESET", "HOLD AT TOP", "BAD TIMING"]
     speed_color = (
         colors["warning"]
-        if speed_feedback in warning_msgs
+        if speed_feedback in _FEEDBACK_WARN
         else colors["good"]
         if speed_feedback == "GOOD REP!"
         else colors["neutral"]
@@ -478,30 +511,44 @@ def draw_movement_bar(img, percentage, bar_value, form_is_good):
     cv2.putText(img, f"{int(percentage)}%", (x, y - 25), UI_CONFIG["fonts"]["main"], 4, color, 4)
 
 
-def draw_rep_counter(img, good_reps, bad_reps):
+def draw_rep_counter(img, handler, good_reps, bad_reps):
+    """
+    Blits the rep counter box from a small buffer cached on the exercise
+    handler, re-rendering the buffer only when the counts have changed.
+    Counts too wide for the box (100 and up) would be clipped by the buffer,
+    so the counter is then drawn straight onto the frame instead.
+    """
     x, y, w, h = UI_CONFIG["rep_counter_box"]
-    colors = UI_CONFIG["colors"]
+    counts = (int(good_reps), int(bad_reps))
+    if handler.rep_cache_counts != counts:
+        handler.rep_cache_counts = counts
+        handler.rep_cache_fits = _rep_counts_fit(w, *counts)
+        if handler.rep_cache_fits:
+            if handler.rep_cache_buf is None:
+                handler.rep_cache_buf = np.empty((h + 1, w + 1, 3), np.uint8)
+            _render_rep_counter(handler.rep_cache_buf, 0, 0, *counts)
+    if not handler.rep_cache_fits:
+        _render_rep_counter(img, x, y, *counts)
+        return
+    roi = img[y : y + h + 1, x : x + w + 1]
+    np.copyto(roi, handler.rep_cache_buf[: roi.shape[0], : roi.shape[1]])
+
+
+def _rep_counts_fit(w, good_reps, bad_reps):
+    font = UI_CONFIG["fonts"]["main"]
+    good_w = cv2.getTextSize(str(good_reps), font, 8, 15)[0][0] + 15
+    bad_w = cv2.getTextSize(str(bad_reps), font, 5, 5)[0][0] + 5
+    return 45 + max(good_w, bad_w) <= w
+
+
+def _render_rep_counter(img, x, y, good_reps, bad_reps):
+    w, h = UI_CONFIG["rep_counter_box"][2:]
+    colors, font = UI_CONFIG["colors"], UI_CONFIG["fonts"]["main"]
     cv2.rectangle(img, (x, y), (x + w, y + h), colors["bg"], cv2.FILLED)
-    cv2.putText(img, "GOOD", (x + 25, y + 50), UI_CONFIG["fonts"]["main"], 3, colors["good"], 3)
-    cv2.putText(
-        img,
-        str(int(good_reps)),
-        (x + 45, y + 150),
-        UI_CONFIG["fonts"]["main"],
-        8,
-        colors["good"],
-        15,
-    )
-    cv2.putText(img, "BAD", (x + 35, y + 200), UI_CONFIG["fonts"]["main"], 3, colors["bad"], 3)
-    cv2.putText(
-        img,
-        str(int(bad_reps)),
-        (x + 45, y + 260),
-        UI_CONFIG["fonts"]["main"],
-        5,
-        colors["bad"],
-        5,
-    )
+    cv2.putText(img, "GOOD", (x + 25, y + 50), font, 3, colors["good"], 3)
+    cv2.putText(img, str(good_reps), (x + 45, y + 150), font, 8, colors["good"], 15)
+    cv2.putText(img, "BAD", (x + 35, y + 200), font, 3, colors["bad"], 3)
+    cv2.putText(img, str(bad_reps), (x + 45, y + 260), font, 5, colors["bad"], 5)
 
 
 def draw_header_info(img, exercise_name):
@@ -516,20 +563,147 @@ def draw_countdown(img, remaining_time):
     cv2.putText(img, str(remaining_time), (550, 450), font, 10, color, 10)
 
 
+# ===============================================================
+#                        CAPTURE & DISPLAY
+# ===============================================================
+
+
+class FrameReader:
+    """
+    Reads frames from the camera on a background thread so the next frame is
+    being grabbed while the current one is analyzed. Frames are grabbed
+    continuously but only decoded once read() asks for one, so the compute
+    stage always gets the newest grabbed frame.
+    """
+
+    def __init__(self, cap, stop_event):
+        self.cap = cap
+        self.stop_event = stop_event
+        self.wanted = threading.Event()
+        self.frames = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            if not self.cap.grab():
+                self.stop_event.set()
+                break
+            # Skip decoding frames nobody is waiting for
+            if not self.wanted.is_set():
+                continue
+            success, img = self.cap.retrieve()
+            if not success:
+                continue
+            self.wanted.clear()
+            # Replace a frame left over from a read() that timed out
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                pass
+            self.frames.put(img)
+
+    def read(self, timeout=0.1):
+        """Returns the next frame, or None if none arrived within the timeout."""
+        self.wanted.set()
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def join(self):
+        self.thread.join()
+
+
+class FrameDisplay:
+    """
+    Shows annotated frames and polls the keyboard. HighGUI must be driven from
+    the main thread (macOS aborts otherwise), so main() calls run() itself
+    while the compute stage works on a background thread. Pressing 'q' sets
+    the shared stop event; other keys are queued for the compute stage.
+    """
+
+    def __init__(self, window_name, stop_event, queue_size=2):
+        self.window_name = window_name
+        self.stop_event = stop_event
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.keys = queue.Queue()
+
+    def run(self):
+        """Displays queued frames until the stop event is set. Call from the main thread."""
+        while not self.stop_event.is_set():
+            try:
+                cv2.imshow(self.window_name, self.frames.get(timeout=0.1))
+            except queue.Empty:
+                pass
+
+            # pollKey (OpenCV >= 4.5.3) handles GUI events without waiting
+            key = cv2.pollKey() if hasattr(cv2, "pollKey") else cv2.waitKey(1)
+            if key == -1:
+                continue
+            key &= 0xFF
+            if key == ord("q"):
+                self.stop_event.set()
+            else:
+                self.keys.put(key)
+        cv2.destroyAllWindows()
+
+    def show(self, img, timeout=0.5):
+        """Queues a frame for display, blocking briefly if the display lags behind."""
+        try:
+            self.frames.put(img, block=True, timeout=timeout)
+        except queue.Full:
+            pass
+
+    def poll_key(self):
+        """Returns the next pressed key, or None if no key is pending."""
+        try:
+            return self.keys.get_nowait()
+        except queue.Empty:
+            return None
+
+
 # ===============================================================
 #                        MAIN APPLICATION
 # ===============================================================
 
+# Pose inference runs on a downsampled copy of each frame. MediaPipe returns
+# normalized landmarks, so findPosition maps them straight back onto the
+# full-resolution frame used for drawing.
+INFERENCE_SIZE = (640, 360)
+
+# Rep counting does not need every camera frame; between inferences the last
+# landmarks are reused for drawing and the exercise state is left untouched.
+# Inference follows a fixed deadline rather than the time since the last run,
+# so with a 30 fps camera it runs on two frames out of three (20 Hz).
+TARGET_INFERENCE_HZ = 20
+
+# Optional MediaPipe Tasks pose models. If the first file is present, inference
+# runs on the GPU delegate where supported. Whenever inference falls back to the
+# CPU, the smaller lite model is preferred if present. With neither file the
+# bundled CPU model is used. Both are published on the MediaPipe Pose Landmarker
+# page (see README).
+POSE_MODEL_PATH = "pose_landmarker_full.task"
+POSE_CPU_MODEL_PATH = "pose_landmarker_lite.task"
 
-def main():
-    cap = cv2.VideoCapture(1)
-    if not cap.isOpened():
-        print("Error: Could not open video stream.")
-        return
-    cap.set(3, 1280)
-    cap.set(4, 720)
 
-    detector = pm.poseDetector()
+def process_frames(detector, reader, display, stop_event):
+    """
+    Compute stage: runs pose inference, updates the exercise and draws the UI
+    for each captured frame, handing the result to the display. Runs on a
+    worker thread; key presses arrive through display.poll_key().
+    """
+    try:
+        _process_frames(detector, reader, display, stop_event)
+    finally:
+        # Let the display loop on the main thread exit if this stage stops
+        stop_event.set()
+
+
+def _process_frames(detector, reader, display, stop_event):
     exercise_keys = {
         ord("1"): "bicep_curl",
         ord("2"): "squat",
@@ -543,14 +717,27 @@ def main():
     program_state = "WAITING_FOR_BODY"
     countdown_duration = 5
     countdown_start_time = 0
-
-    while True:
-        success, img = cap.read()
-        if not success:
-            break
-
-        img = detector.findPose(img, draw=False)
-        lmList = detector.findPosition(img, draw=False)
+    lmList = np.empty((0, 4))
+    small_buf = np.empty((INFERENCE_SIZE[1], INFERENCE_SIZE[0], 3), np.uint8)
+    infer_period = 1 / TARGET_INFERENCE_HZ
+    next_infer_time = 0.0
+    tracking_values = None
+
+    while not stop_event.is_set():
+        img = reader.read()
+        if img is None:
+            continue
+
+        # One monotonic timestamp per frame, immune to wall-clock adjustments
+        now = time.monotonic()
+        fresh = now >= next_infer_time
+        if fresh:
+            cv2.resize(img, INFERENCE_SIZE, dst=small_buf, interpolation=cv2.INTER_AREA)
+            detector.findPose(small_buf, draw=False, timestampMs=int(now * 1000))
+            lmList = detector.findPosition(img, draw=False)
+            # Advance by whole periods so late frames don't lower the rate, but
+            # never fall more than one period behind after a stall.
+            next_infer_time = max(next_infer_time + infer_period, now - infer_period)
 
         if program_state == "WAITING_FOR_BODY":
             draw_header_info(img, current_exercise_name)
@@ -559,16 +746,16 @@ def main():
                 is_visible = check_body_visibility(detector.lmList, visibility_config["landmarks"])
                 if is_visible:
                     program_state = "COUNTDOWN"
-                    countdown_start_time = time.time()
+                    countdown_start_time = now
                 else:
                     draw_visibility_prompt(img, visibility_config["feedback"])
             else:
                 program_state = "COUNTDOWN"
-                countdown_start_time = time.time()
+                countdown_start_time = now
 
         elif program_state == "COUNTDOWN":
             draw_header_info(img, current_exercise_name)
-            time_since_start = time.time() - countdown_start_time
+            time_since_start = now - countdown_start_time
             if time_since_start >= countdown_duration:
                 program_state = "TRACKING"
             else:
@@ -584,6 +771,9 @@ def main():
             )
 
             if len(lmList) != 0:
+                # Only advance the exercise on fresh landmarks so rep timing stays correct
+                if fresh or tracking_values is None:
+                    tracking_values = exercise_handler.update(lmList, now)
                 (
                     bar,
                     per,
@@ -592,28 +782,61 @@ def main():
                     form_feedback,
                     speed_feedback,
                     pace_progress,
-                ) = exercise_handler.update(img, detector, lmList)
+                ) = tracking_values
+                exercise_handler.draw_skeleton(img, lmList)
 
             draw_feedback_box(img, form_feedback, speed_feedback)
             draw_pace_bar(img, pace_progress, exercise_handler)
             draw_movement_bar(img, per, bar, form_feedback == "GOOD")
-            draw_rep_counter(img, good_count, bad_count)
+            draw_rep_counter(img, exercise_handler, good_count, bad_count)
             draw_header_info(img, current_exercise_name)
 
-        cv2.imshow("AI Trainer", img)
-
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord("q"):
-            break
+        display.show(img)
 
+        key = display.poll_key()
         if key == ord("r") or key in exercise_keys:
             if key in exercise_keys:
                 current_exercise_name = exercise_keys[key]
             exercise_handler = Exercise(**EXERCISE_CONFIG[current_exercise_name])
             program_state = "WAITING_FOR_BODY"
+            tracking_values = None
+
+
+def main():
+    # The per-frame cv2 calls work on small images and regions; OpenCV's own
+    # thread pool only adds contention with the capture and compute threads
+    cv2.setNumThreads(1)
+
+    cap = cv2.VideoCapture(1)
+    if not cap.isOpened():
+        print("Error: Could not open video stream.")
+        return
+    cap.set(3, 1280)
+    cap.set(4, 720)
+
+    gpu_model = POSE_MODEL_PATH if os.path.exists(POSE_MODEL_PATH) else None
+    cpu_model = POSE_CPU_MODEL_PATH if os.path.exists(POSE_CPU_MODEL_PATH) else None
+    detector = pm.poseDetector(
+        modelPath=gpu_model or cpu_model,
+        useGpu=gpu_model is not None,
+        cpuModelPath=cpu_model,
+    )
+
+    stop_event = threading.Event()
+    reader = FrameReader(cap, stop_event).start()
+    display = FrameDisplay("AI Trainer", stop_event)
+    worker = threading.Thread(target=process_frames, args=(detector, reader, display, stop_event), daemon=True)
+    worker.start()
+
+    # imshow and key polling stay on the main thread; returns once 'q' is
+    # pressed or the capture/compute stages stop
+    display.run()
 
+    stop_event.set()
+    worker.join()
+    reader.join()
     cap.release()
-    cv2.destroyAllWindows()
+    detector.close()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,35 @@
 import cv2
 import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2
+import numpy as np
 import time
 import math
 
 
 class poseDetector:
-    def __init__(self, mode=False, upBody=False, smooth=True, detectionCon=0.8, trackCon=0.8):
+    """
+    Wraps MediaPipe pose estimation. By default the bundled mp.solutions.pose
+    model runs on the CPU. Passing modelPath (a MediaPipe Tasks
+    pose_landmarker .task file) runs a PoseLandmarker instead, on the GPU
+    delegate when useGpu is set and the platform supports it; if the GPU
+    delegate cannot be created or fails on the first inference, it falls
+    back to the CPU. Whenever it runs on the CPU delegate, cpuModelPath
+    (e.g. the lighter pose_landmarker_lite model) is loaded in place of
+    modelPath if given.
+    Call close() when done to release the graph.
+    """
+
+    def __init__(
+        self,
+        mode=False,
+        upBody=False,
+        smooth=True,
+        detectionCon=0.8,
+        trackCon=0.8,
+        modelPath=None,
+        useGpu=True,
+        cpuModelPath=None,
+    ):
         self.mode = mode
         self.upBody = upBody
         self.smooth = smooth
@@ -14,39 +38,133 @@ class poseDetector:
 
         self.mpDraw = mp.solutions.drawing_utils
         self.mpPose = mp.solutions.pose
-        self.pose = self.mpPose.Pose(
-            static_image_mode=self.mode,
-            smooth_landmarks=self.smooth,
-            min_detection_confidence=self.detectionCon,
+        self.pose = None
+        self.landmarker = None
+        self.delegate = "cpu"
+        if modelPath:
+            self._cpuModelPath = cpuModelPath or modelPath
+            self.landmarker = self._createLandmarker(modelPath, useGpu)
+            self._timestampMs = 0
+            # Set once an inference has succeeded on the current landmarker
+            self._landmarkerVerified = False
+        else:
+            self.pose = self.mpPose.Pose(
+                static_image_mode=self.mode,
+                smooth_landmarks=self.smooth,
+                min_detection_confidence=self.detectionCon,
+                min_tracking_confidence=self.trackCon,
+            )
+        self.landmarks = None
+        # Reused by findPosition every frame; one row per pose landmark
+        self._lmBuf = np.zeros((33, 4), dtype=np.float32)
+        # RGB conversion target reused by findPose while the input size is unchanged
+        self._rgbBuf = None
+
+    def _createLandmarker(self, modelPath, useGpu):
+        if useGpu:
+            try:
+                landmarker = self._buildLandmarker(modelPath, mp.tasks.BaseOptions.Delegate.GPU)
+                self.delegate = "gpu"
+                return landmarker
+            except (RuntimeError, NotImplementedError):
+                # The GPU delegate is not supported on every platform (e.g. Windows)
+                pass
+        self.delegate = "cpu"
+        return self._buildLandmarker(self._cpuModelPath, mp.tasks.BaseOptions.Delegate.CPU)
+
+    def _buildLandmarker(self, modelPath, delegate):
+        vision = mp.tasks.vision
+        options = vision.PoseLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=modelPath, delegate=delegate),
+            running_mode=vision.RunningMode.IMAGE if self.mode else vision.RunningMode.VIDEO,
+            num_poses=1,
+            min_pose_detection_confidence=self.detectionCon,
             min_tracking_confidence=self.trackCon,
         )
-
-    def findPose(self, img, draw=True):
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.pose.process(imgRGB)
-        if self.results.pose_landmarks:
-            if draw:
-                self.mpDraw.draw_landmarks(img, self.results.pose_landmarks, self.mpPose.POSE_CONNECTIONS)
+        return vision.PoseLandmarker.create_from_options(options)
+
+    def _detect(self, mpImage):
+        if self.mode:
+            return self.landmarker.detect(mpImage)
+        return self.landmarker.detect_for_video(mpImage, self._timestampMs)
+
+    def close(self):
+        """Releases the MediaPipe graph and any GPU resources it holds."""
+        if self.landmarker is not None:
+            self.landmarker.close()
+        else:
+            self.pose.close()
+
+    def findPose(self, img, draw=True, timestampMs=None):
+        """
+        Runs pose detection on img. In video mode timestampMs (milliseconds on
+        a monotonic clock) stamps the frame; it defaults to the current time.
+        """
+        if self._rgbBuf is None or self._rgbBuf.shape != img.shape:
+            self._rgbBuf = np.empty_like(img)
+        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._rgbBuf)
+        if self.landmarker is not None:
+            mpImage = mp.Image(image_format=mp.ImageFormat.SRGB, data=imgRGB)
+            if not self.mode:
+                if timestampMs is None:
+                    timestampMs = int(time.monotonic() * 1000)
+                # Video mode needs strictly increasing timestamps
+                self._timestampMs = max(self._timestampMs + 1, timestampMs)
+            try:
+                result = self._detect(mpImage)
+            except RuntimeError:
+                # Some drivers accept the GPU delegate but fail on the first
+                # inference; rebuild on the CPU once and retry the frame
+                if self.delegate != "gpu" or self._landmarkerVerified:
+                    raise
+                self.landmarker.close()
+                self.landmarker = self._buildLandmarker(self._cpuModelPath, mp.tasks.BaseOptions.Delegate.CPU)
+                self.delegate = "cpu"
+                result = self._detect(mpImage)
+            self._landmarkerVerified = True
+            self.landmarks = result.pose_landmarks[0] if result.pose_landmarks else None
+            if self.landmarks and draw:
+                landmarkList = landmark_pb2.NormalizedLandmarkList()
+                landmarkList.landmark.extend(
+                    landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=lm.z) for lm in self.landmarks
+                )
+                self.mpDraw.draw_landmarks(img, landmarkList, self.mpPose.POSE_CONNECTIONS)
+        else:
+            self.results = self.pose.process(imgRGB)
+            self.landmarks = self.results.pose_landmarks.landmark if self.results.pose_landmarks else None
+            if self.results.pose_landmarks:
+                if draw:
+                    self.mpDraw.draw_landmarks(img, self.results.pose_landmarks, self.mpPose.POSE_CONNECTIONS)
         return img
 
     def findPosition(self, img, draw=True):
-        self.lmList = []
-        if self.results.pose_landmarks:
-            for id, lm in enumerate(self.results.pose_landmarks.landmark):
-                h, w, c = img.shape
+        """
+        Returns the landmarks as an (N, 4) float32 array of [id, x, y, visibility]
+        rows, with x and y in whole pixels. The array is empty if no pose was
+        found. It is a view of a buffer that the next call overwrites.
+        """
+        n = 0
+        if self.landmarks:
+            landmarks = self.landmarks
+            if len(landmarks) > len(self._lmBuf):
+                self._lmBuf = np.zeros((len(landmarks), 4), dtype=np.float32)
+            h, w, c = img.shape
+            for id, lm in enumerate(landmarks):
                 # lm.visibility is the value we need
                 cx, cy, visibility = int(lm.x * w), int(lm.y * h), lm.visibility
-                # Append all four values to the list
-                self.lmList.append([id, cx, cy, visibility])
+                # Write all four values into the landmark's row
+                self._lmBuf[id] = (id, cx, cy, visibility)
                 if draw:
                     cv2.circle(img, (cx, cy), 5, (255, 0, 0), cv2.FILLED)
+            n = len(landmarks)
+        self.lmList = self._lmBuf[:n]
         return self.lmList
 
     def findAngle(self, p1, p2, p3, img=None, draw=True):
         # Get the landmark coordinates directly, ignoring the visibility score
-        _, x1, y1, *_ = p1
-        _, x2, y2, *_ = p2
-        _, x3, y3, *_ = p3
+        x1, y1 = int(p1[1]), int(p1[2])
+        x2, y2 = int(p2[1]), int(p2[2])
+        x3, y3 = int(p3[1]), int(p3[2])
 
         # Calculate the Angle
         angle = math.degrees(math.atan2(y3 - y2, x3 - x2) - math.atan2(y1 - y2, x1 - x2))
@@ -90,7 +208,7 @@ def main():
         lmList = detector.findPosition(img, draw=False)
         if len(lmList) != 0:
             print(lmList[14])
-            cv2.circle(img, (lmList[14][1], lmList[14][2]), 15, (0, 0, 255), cv2.FILLED)
+            cv2.circle(img, (int(lmList[14][1]), int(lmList[14][2])), 15, (0, 0, 255), cv2.FILLED)
 
         cTime = time.time()
         fps = 1 / (cTime - pTime)
@@ -0,0 +1,11 @@
+# Cython declarations augmenting exercise_core.py; see that module's docstring.
+
+cdef class ExerciseCore:
+    cdef public double concentric_time, hold_time, eccentric_time, time_tolerance, total_rep_time
+    cdef double _inv_total_time, _concentric_frac, _concentric_hold_frac
+    cdef public int good_reps, bad_reps, stage
+    cdef public double stage_start_time, feedback_set_time
+    cdef public str speed_feedback
+    cdef public bint rep_timing_is_good
+
+    cpdef tuple update(self, double per, bint form_ok, double current_time)
@@ -0,0 +1,120 @@
+"""
+Rep-counting state machine used by AiTrainer.Exercise.
+
+This module is plain Python and runs as-is. Typed declarations for Cython
+live in exercise_core.pxd, so it can optionally be compiled in place with:
+
+    cythonize -i -3 --annotate exercise_core.py
+
+The compiled extension is then imported instead of this file.
+"""
+
+# Stage codes, indexing STAGE_NAMES and STAGE_DEFAULT_MSG.
+DOWN, GOING_UP, HOLD, GOING_DOWN = 0, 1, 2, 3
+STAGE_NAMES = ("down", "going_up", "hold", "going_down")
+
+# Speed prompt shown in each stage when no recent warning is being held on screen.
+STAGE_DEFAULT_MSG = ("LIFT UP", "GO", "HOLD", "BACK SLOWLY")
+
+# Feedback message groups, shared by the rep state machine and the UI.
+INTER_STAGE_WARNINGS = frozenset(("TOO FAST", "TOO SLOW", "HOLD AT TOP"))
+FINAL_REP_MESSAGES = INTER_STAGE_WARNINGS | frozenset(("GOOD REP!", "BAD TIMING", "REP RESET"))
+
+
+class ExerciseCore:
+    """
+    Tracks the stage of the current rep from its completion percentage,
+    checks the tempo of each phase and counts good and bad reps.
+    """
+
+    def __init__(self, concentric_time, hold_time, eccentric_time, time_tolerance, current_time):
+        self.concentric_time = concentric_time
+        self.hold_time = hold_time
+        self.eccentric_time = eccentric_time
+        self.time_tolerance = time_tolerance
+        self.total_rep_time = concentric_time + hold_time + eccentric_time
+
+        # Pace bar fractions, precomputed so update() only multiplies.
+        self._inv_total_time = 1 / self.total_rep_time if self.total_rep_time > 0 else 0.0
+        self._concentric_frac = concentric_time * self._inv_total_time
+        self._concentric_hold_frac = (concentric_time + hold_time) * self._inv_total_time
+
+        self.good_reps = 0
+        self.bad_reps = 0
+        self.stage = DOWN
+        self.stage_start_time = current_time
+        self.feedback_set_time = current_time
+        self.speed_feedback = "START"
+        self.rep_timing_is_good = True
+
+    def update(self, per, form_ok, current_time):
+        """
+        Advances the state machine for one frame, returning
+        (good_reps, bad_reps, speed_feedback, pace_progress).
+        """
+        pace_progress = 0.0
+        elapsed_stage_time = current_time - self.stage_start_time
+
+        if (not form_ok and self.stage != DOWN) or (per <= 5 and (self.stage == GOING_UP or self.stage == HOLD)):
+            self.stage = DOWN
+            self.speed_feedback = "REP RESET"
+            self.feedback_set_time = current_time
+
+        # Keep a recent warning on screen for a moment (or a rep result while
+        # resting), otherwise show the current stage's default prompt.
+        feedback_age = current_time - self.feedback_set_time
+        if self.stage == DOWN:
+            keep_feedback = self.speed_feedback in FINAL_REP_MESSAGES and feedback_age < 1.0
+        else:
+            keep_feedback = self.speed_feedback in INTER_STAGE_WARNINGS and feedback_age < 0.5
+        if not keep_feedback:
+            self.speed_feedback = STAGE_DEFAULT_MSG[self.stage]
+
+        if self.stage == DOWN:
+            if per >= 10:
+                self.stage = GOING_UP
+                self.stage_start_time = current_time
+                self.rep_timing_is_good = True
+
+        elif self.stage == GOING_UP:
+            pace_progress = min(elapsed_stage_time, self.concentric_time) * self._inv_total_time
+            if per >= 90:
+                if abs(elapsed_stage_time - self.concentric_time) > self.time_tolerance:
+                    self.speed_feedback = "TOO FAST" if elapsed_stage_time < self.concentric_time else "TOO SLOW"
+                    self.feedback_set_time = current_time
+                    self.rep_timing_is_good = False
+                self.stage = HOLD
+                self.stage_start_time = current_time
+            elif elapsed_stage_time > self.concentric_time + self.time_tolerance:
+                self.speed_feedback = "TOO SLOW"
+                self.rep_timing_is_good = False
+
+        elif self.stage == HOLD:
+            pace_progress = self._concentric_frac + elapsed_stage_time * self._inv_total_time
+            if per < 90:
+                self.speed_feedback = "HOLD AT TOP"
+                self.rep_timing_is_good = False
+                self.feedback_set_time = current_time
+                self.stage = GOING_DOWN
+                self.stage_start_time = current_time
+            elif elapsed_stage_time >= self.hold_time:
+                self.stage = GOING_DOWN
+                self.stage_start_time = current_time
+
+        elif self.stage == GOING_DOWN:
+            pace_progress = self._concentric_hold_frac + elapsed_stage_time * self._inv_total_time
+            if per <= 5:
+                if abs(elapsed_stage_time - self.eccentric_time) > self.time_tolerance:
+                    self.speed_feedback = "TOO FAST" if elapsed_stage_time < self.eccentric_time else "TOO SLOW"
+                    self.rep_timing_is_good = False
+                if self.rep_timing_is_good and form_ok:
+                    self.good_reps += 1
+                    self.speed_feedback = "GOOD REP!"
+                else:
+                    self.bad_reps += 1
+                    if self.speed_feedback not in INTER_STAGE_WARNINGS:
+                        self.speed_feedback = "BAD TIMING"
+                self.feedback_set_time = current_time
+                self.stage = DOWN
+
+        return self.good_reps, self.bad_reps, self.speed_feedback, min(pace_progress, 1.0)